@@ -6,13 +6,32 @@ import csv as csv_mod
 import datetime as datetime_mod
 import logging
 import os
+import pathlib
+import re
 
 import numpy as np
 import pytz
 
 
 ISO_8601_FORMAT = '%Y-%m-%d %H:%M:%S'
+# Zero-padded datetimes in ISO_8601_FORMAT, which get_epochs parses
+# with NumPy
+ISO_8601_RE = re.compile(
+    r'[0-9]{4}-[0-9]{2}-[0-9]{2} [0-9]{2}:[0-9]{2}:[0-9]{2}\Z'
+)
+UNIX_EPOCH = datetime_mod.datetime(1970, 1, 1)
+# Buffer size for reading data files, larger than the default to
+# reduce the number of reads on large files
+DATA_FILE_BUFFER_SIZE = 1 << 20
 SCHEMA_PATH = os.path.join(os.path.dirname(__file__), 'schema.sql')
+SCHEMA_SQL = pathlib.Path(SCHEMA_PATH).read_text()
+# Bulk load settings: fewer syncs, temporary structures and a 64 MiB
+# page cache in memory
+BULK_LOAD_PRAGMAS = {
+    'synchronous': 'NORMAL',
+    'temp_store': 'MEMORY',
+    'cache_size': -65536,
+}
 LOG = logging.getLogger('spowtd.load')
 
 
@@ -23,7 +42,14 @@ def load_data(
     water_level_data_file,
     time_zone_name,
 ):
-    """Load data into Spowtd data file"""
+    """Load data into Spowtd data file
+
+    The data are loaded in a single transaction, which is rolled back
+    if loading fails.  The connection's BULK_LOAD_PRAGMAS are changed
+    for the duration of the transaction, and restored afterwards
+    whether or not loading succeeds.
+
+    """
     time_zone = pytz.timezone(time_zone_name)
 
     connection.execute("PRAGMA foreign_keys = 1")
@@ -39,90 +65,141 @@ def load_data(
     if tables:
         raise ValueError('Database already populated; remove before loading')
 
-    with open(SCHEMA_PATH, 'rt') as schema_file:
-        cursor.executescript(schema_file.read())
-    # Format: Datetime, precipitation intensity (mm / h)
-    precip_csv = csv_mod.reader(precipitation_data_file, delimiter=',')
-    header = next(precip_csv)
-    assert header[0].lower().startswith('datetime'), header
-    # Strategy: load into staging tables first, then establish time
-    # grid
-    cursor.executemany(
-        """
-    INSERT INTO rainfall_intensity_staging
-      (epoch, rainfall_intensity_mm_h)
-    VALUES (?, ?)""",
-        generate_timestamped_rows(precip_csv, time_zone),
-    )
-    del precip_csv
+    cursor.executescript(SCHEMA_SQL)
+    previous_pragmas = {
+        name: connection.execute('PRAGMA {}'.format(name)).fetchone()[0]
+        for name in BULK_LOAD_PRAGMAS
+    }
+    set_pragmas(connection, BULK_LOAD_PRAGMAS)
+    try:
+        # Load everything in a single transaction, also when the
+        # connection is in autocommit mode
+        cursor.execute("BEGIN IMMEDIATE")
+        # Strategy: load into staging tables first, then establish time
+        # grid
+        # Format: Datetime, precipitation intensity (mm / h)
+        load_staging(
+            cursor,
+            precipitation_data_file,
+            'rainfall_intensity_staging',
+            'rainfall_intensity_mm_h',
+            time_zone,
+        )
+        # Format: Datetime, evapotranspiration (mm / h)
+        load_staging(
+            cursor,
+            evapotranspiration_data_file,
+            'evapotranspiration_staging',
+            'evapotranspiration_mm_h',
+            time_zone,
+        )
+        # Format: Datetime, water level (mm)
+        load_staging(
+            cursor,
+            water_level_data_file,
+            'water_level_staging',
+            'zeta_mm',
+            time_zone,
+        )
+        time_grid, time_step = populate_grid_time(cursor, time_zone_name)
+        populate_rainfall_intensity(cursor, time_grid, time_step)
+        populate_evapotranspiration(cursor, time_grid, time_step, tz=time_zone)
+        populate_water_level(cursor, time_grid)
+        cursor.close()
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        set_pragmas(connection, previous_pragmas)
 
-    # Format: Datetime, evapotranspiration (mm / h)
-    et_csv = csv_mod.reader(evapotranspiration_data_file, delimiter=',')
-    header = next(et_csv)
-    assert header[0].lower().startswith('datetime'), header
-    cursor.executemany(
-        """
-    INSERT INTO evapotranspiration_staging
-      (epoch, evapotranspiration_mm_h)
-    VALUES (?, ?)""",
-        generate_timestamped_rows(et_csv, time_zone),
-    )
-    del et_csv
 
-    water_level_csv = csv_mod.reader(water_level_data_file, delimiter=',')
-    # Format: Datetime, water level (mm)
-    header = next(water_level_csv)
+def set_pragmas(connection, pragmas):
+    """Set SQLite pragmas from a mapping of names to values"""
+    for name, value in pragmas.items():
+        connection.execute('PRAGMA {} = {}'.format(name, value))
+
+
+def load_staging(cursor, data_file, table, value_column, tz):
+    """Load a time series from a CSV file into a staging table
+
+    The CSV file must have a header row, a first column of text
+    datetimes in ISO 8601 format and a second column of values, which
+    are inserted into value_column of the staging table.  Blank lines
+    are skipped.  Datetimes are converted to UNIX timestamps as a
+    single array (see get_epochs).
+
+    """
+    data_csv = csv_mod.reader(data_file, delimiter=',')
+    header = next(data_csv)
     assert header[0].lower().startswith('datetime'), header
+    datetimes = []
+    values = []
+    for row in data_csv:
+        if not row:
+            # Blank line
+            continue
+        if len(row) != 2:
+            raise ValueError(
+                'Expected 2 fields on line {} of {} data, got {}'.format(
+                    data_csv.line_num, table, len(row)
+                )
+            )
+        datetimes.append(row[0])
+        values.append(row[1])
+    if not datetimes:
+        raise ValueError('No data rows for {}'.format(table))
+    epochs = get_epochs(datetimes, tz)
     cursor.executemany(
         """
-    INSERT INTO water_level_staging
-      (epoch, zeta_mm)
-    VALUES (?, ?)""",
-        generate_timestamped_rows(water_level_csv, time_zone),
+    INSERT INTO {} (epoch, {})
+    VALUES (?, ?)""".format(
+            table, value_column
+        ),
+        zip(epochs.tolist(), values),
     )
-    time_grid, time_step = populate_grid_time(cursor, time_zone_name)
-    populate_rainfall_intensity(cursor, time_grid, time_step)
-    populate_evapotranspiration(cursor, time_grid, time_step, tz=time_zone)
-    populate_water_level(cursor, time_grid)
-    cursor.close()
-    connection.commit()
 
 
 def populate_water_level(cursor, time_grid):
-    """Interpolate water level onto precipitation time grid"""
-    time_grid = np.asarray(time_grid)
+    """Interpolate water level onto precipitation time grid
+
+    The time grid is the int64 array of epochs returned by
+    populate_grid_time.
+
+    """
     cursor.execute(
         """
     SELECT epoch, zeta_mm
     FROM water_level_staging"""
     )
-    zeta_t, zeta_mm = zip(*cursor.fetchall())
+    staging = np.array(
+        cursor.fetchall(), dtype=[('epoch', 'int64'), ('zeta_mm', 'float64')]
+    )
+    zeta_t = staging['epoch']
+    zeta_mm = staging['zeta_mm']
     # Label times in the time grid with valid data intervals, starting
     # from 1.  Invalid times are left with a NULL data interval.
-    zeta_t = np.array(zeta_t)
     # Epoch is an integer
     assert np.issubdtype(time_grid.dtype, np.integer), time_grid.dtype
-    assert np.issubdtype(zeta_t.dtype, np.integer), zeta_t.dtype
     # Find gaps in the input time series
     time_steps = np.diff(zeta_t)
     gap_i = np.nonzero(time_steps != time_steps.min())[0]
     assert ((zeta_t[gap_i + 1] - zeta_t[gap_i]) > time_steps.min()).all(), (
         zeta_t[gap_i + 1] - zeta_t[gap_i]
     )
-    valid_boundaries = (
-        [time_grid[0]]
-        + sum(
-            (list(pair) for pair in zip(zeta_t[gap_i], zeta_t[gap_i + 1])), []
+    valid_boundaries = np.concatenate(
+        (
+            time_grid[:1],
+            np.column_stack((zeta_t[gap_i], zeta_t[gap_i + 1])).ravel(),
+            time_grid[-1:],
         )
-        + [time_grid[-1]]
     )
     assert len(valid_boundaries) % 2 == 0
     valid_intervals = [
         (valid_boundaries[i], valid_boundaries[i + 1], i // 2 + 1)
         for i in range(0, len(valid_boundaries), 2)
     ]
-    data_intervals = np.empty((len(time_grid),), dtype='int64')
-    data_intervals[:] = -1
+    data_intervals = np.full(time_grid.shape, -1, dtype='int64')
     for start, through, label in valid_intervals:
         data_intervals[(time_grid >= start) & (time_grid <= through)] = label
     valid_mask = data_intervals != -1
@@ -136,16 +213,16 @@ def populate_water_level(cursor, time_grid):
         ),
     )
 
-    # Interpolate
-    zeta_on_grid = np.interp(time_grid[:-1], zeta_t, zeta_mm)
+    # Interpolate onto valid grid times, except the end of the last
+    # rainfall interval
+    valid_mask[-1] = False
+    valid_time = time_grid[valid_mask]
+    zeta_on_grid = np.interp(valid_time, zeta_t, zeta_mm)
     cursor.executemany(
         """
     INSERT INTO water_level (epoch, zeta_mm)
     VALUES (?, ?)""",
-        zip(
-            time_grid[valid_mask].tolist(),
-            zeta_on_grid[valid_mask[:-1]].tolist(),
-        ),
+        zip(valid_time.tolist(), zeta_on_grid.tolist()),
     )
 
 
@@ -156,27 +233,27 @@ def populate_grid_time(cursor, time_zone_name):
     and returns the time grid array and time step as a tuple.
 
     """
-    time_grid = [
-        epoch
-        for epoch, in cursor.execute(
-            """
-        WITH a AS (
-          SELECT min(epoch) AS min_t_zeta,
-                 max(epoch) AS max_t_zeta
-          FROM water_level_staging
-        )
-        SELECT epoch
-        FROM rainfall_intensity_staging AS ris
-        JOIN a
-          ON ris.epoch >= min_t_zeta
-          AND ris.epoch <= max_t_zeta
-        ORDER BY epoch"""
-        )
-    ]
-    delta_t = sorted(set(np.diff(time_grid)))
-    if len(delta_t) != 1:
+    cursor.execute(
+        """
+    WITH a AS (
+      SELECT min(epoch) AS min_t_zeta,
+             max(epoch) AS max_t_zeta
+      FROM water_level_staging
+    )
+    SELECT epoch
+    FROM rainfall_intensity_staging AS ris
+    JOIN a
+      ON ris.epoch >= min_t_zeta
+      AND ris.epoch <= max_t_zeta
+    ORDER BY epoch"""
+    )
+    time_grid = np.fromiter((epoch for epoch, in cursor), dtype='int64')
+    delta_t = np.diff(time_grid)
+    if not delta_t.size or (delta_t != delta_t[0]).any():
         raise ValueError(
-            'Nonuniform time steps in rainfall data: {} s'.format(delta_t)
+            'Nonuniform time steps in rainfall data: {} s'.format(
+                np.unique(delta_t).tolist()
+            )
         )
     time_step = int(delta_t[0])
     del delta_t
@@ -187,12 +264,12 @@ def populate_grid_time(cursor, time_zone_name):
         (time_zone_name, time_step),
     )
     # Add a grid time for the end of the last rainfall interval
-    time_grid.append(time_grid[-1] + time_step)
+    time_grid = np.append(time_grid, time_grid[-1] + time_step)
     cursor.executemany(
         """
     INSERT INTO grid_time (epoch)
     VALUES (?)""",
-        [(epoch,) for epoch in time_grid],
+        zip(time_grid.tolist()),
     )
     return (time_grid, time_step)
 
@@ -208,7 +285,7 @@ def populate_rainfall_intensity(cursor, time_grid, time_step):
     JOIN grid_time AS gt
       USING (epoch)
     WHERE ris.epoch <= ?""",
-        (time_step, time_grid[-2]),
+        (time_step, int(time_grid[-2])),
     )
 
 
@@ -250,30 +327,108 @@ def populate_evapotranspiration(cursor, time_grid, time_step, tz):
     JOIN grid_time AS gt
       USING (epoch)
     WHERE es.epoch <= ?""",
-        (time_step, time_grid[-2]),
+        (time_step, int(time_grid[-2])),
+    )
+
+
+def get_epochs(datetimes, tz):
+    """Convert a sequence of text datetimes to an array of UNIX timestamps
+
+    The datetimes must be in ISO 8601 format (ISO_8601_FORMAT).
+    Zero-padded datetimes are parsed all at once by NumPy; any others
+    are parsed one at a time with strptime, which raises ValueError if
+    they do not match the format.  The pytz object passed as the
+    second argument is used to convert the datetimes to UTC.  The UTC
+    offset is looked up once for each distinct day, unless the offset
+    changes during that day, in which case it is looked up for each
+    datetime in the day.  This takes two localizations per day, rather
+    than one per datetime.
+
+    """
+    text = np.asarray(datetimes, dtype=str)
+    is_padded = np.array(
+        [ISO_8601_RE.match(value) is not None for value in text.tolist()],
+        dtype=bool,
+    )
+    naive = np.empty(text.shape, dtype='int64')
+    try:
+        parsed = text[is_padded].astype('datetime64[s]')
+    except ValueError:
+        # Out-of-range fields; leave these to strptime
+        is_padded[:] = False
+    else:
+        # Reject anything NumPy normalized, such as 24:00:00
+        round_trip = (
+            np.char.replace(np.datetime_as_string(parsed, unit='s'), 'T', ' ')
+            == text[is_padded]
+        )
+        naive[is_padded] = parsed.astype('int64')
+        is_padded[is_padded] = round_trip
+    for i in np.nonzero(~is_padded)[0].tolist():
+        since_epoch = (
+            datetime_mod.datetime.strptime(text[i], ISO_8601_FORMAT)
+            - UNIX_EPOCH
+        )
+        naive[i] = since_epoch.days * 86400 + since_epoch.seconds
+
+    days, day_index = np.unique(naive // 86400, return_inverse=True)
+    day_offsets = [
+        get_day_utc_offset(tz, UNIX_EPOCH + datetime_mod.timedelta(days=day))
+        for day in days.tolist()
+    ]
+    offsets = np.array(
+        [0 if offset is None else offset for offset in day_offsets],
+        dtype='int64',
+    )[day_index]
+    is_transition_day = np.array(
+        [offset is None for offset in day_offsets], dtype=bool
     )
+    for i in np.nonzero(is_transition_day[day_index])[0].tolist():
+        offsets[i] = get_utc_offset(
+            tz, UNIX_EPOCH + datetime_mod.timedelta(seconds=int(naive[i]))
+        )
+    return naive - offsets
+
+
+def get_day_utc_offset(tz, day):
+    """Return the UTC offset shared by a local day, in seconds
+
+    Returns None if the offset changes during the day starting at the
+    naive datetime day, so that datetimes in that day must be
+    localized individually.
+
+    """
+    utc_offset_s = get_utc_offset(tz, day)
+    if utc_offset_s != get_utc_offset(
+        tz, day + datetime_mod.timedelta(hours=23, minutes=59, seconds=59)
+    ):
+        return None
+    return utc_offset_s
+
+
+def get_utc_offset(tz, naive):
+    """Return the UTC offset of a naive local datetime, in seconds"""
+    utc_offset = tz.localize(naive).utcoffset()
+    assert utc_offset is not None
+    return utc_offset.days * 86400 + utc_offset.seconds
 
 
 def generate_timestamped_rows(rows, tz):
     """Generate rows with the first value replaced by a UNIX timestamp
 
-    The first item in each row is assumed to be a text datetime
-    in ISO 8601 format.
+    The first item in each row is assumed to be a text datetime in
+    ISO 8601 format (ISO_8601_FORMAT).
 
     The pytz object passed as the second argument is used to convert
     the datetime to UTC (if necessary) and convert to a UNIX timestamp
-    (seconds since 1970-01-01 00:00:00).
+    (seconds since 1970-01-01 00:00:00).  The rows are read in full
+    and converted with get_epochs.
+
+    load_data uses get_epochs directly, and this generator is no
+    longer called by spowtd itself.
 
     """
-    for row in rows:
-        local_datetime = tz.localize(
-            datetime_mod.datetime.strptime(row[0], ISO_8601_FORMAT)
-        )
-        is_aware = local_datetime.tzinfo.utcoffset(local_datetime) is not None
-        assert is_aware
-        epoch = local_datetime.timestamp()
-        if not epoch.is_integer():
-            raise ValueError(
-                'Non-integer seconds in datetime {}'.format(row[0])
-            )
-        yield [int(epoch)] + row[1:]
+    rows = list(rows)
+    epochs = get_epochs([row[0] for row in rows], tz)
+    for epoch, row in zip(epochs.tolist(), rows):
+        yield [epoch] + row[1:]
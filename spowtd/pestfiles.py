@@ -67,8 +67,10 @@ def generate_rise_tpl_file(
     connection, parameters, configuration, outfile, precision
 ):
     """Generate template file for calibration against rise curve"""
+    sy_parameters = parameters['specific_yield']
+    T_parameters = parameters['transmissivity']
     lines = ['ptf @', 'specific_yield:']
-    if parameters['specific_yield']['type'] == 'peatclsm':
+    if sy_parameters['type'] == 'peatclsm':
         lines += [
             '  type: peatclsm',
             '  sd: @sd                      @',
@@ -77,50 +79,42 @@ def generate_rise_tpl_file(
             '  psi_s: @psi_s                   @',
         ]
     else:
-        assert parameters['specific_yield']['type'] == 'spline'
+        assert sy_parameters['type'] == 'spline'
         lines += ['  type: spline', '  zeta_knots_mm:']
         lines += [
             '    - {}'.format(value)
-            for value in parameters['specific_yield']['zeta_knots_mm']
+            for value in sy_parameters['zeta_knots_mm']
         ]
         lines += ['  sy_knots:  # Specific yield, dimensionless']
         lines += [
             '    - @sy_knot_{}@'.format(str(i).ljust(16))
-            for i in range(
-                1, len(parameters['specific_yield']['sy_knots']) + 1
-            )
+            for i in range(1, len(sy_parameters['sy_knots']) + 1)
         ]
     lines += ['transmissivity:']
-    if parameters['transmissivity']['type'] == 'peatclsm':
+    if T_parameters['type'] == 'peatclsm':
         lines += [
             '  type: peatclsm',
-            '  Ksmacz0: {}  # m/s'.format(
-                parameters['transmissivity']['Ksmacz0']
-            ),
-            '  alpha: {}  # dimensionless'.format(
-                parameters['transmissivity']['alpha']
-            ),
-            '  zeta_max_cm: {}'.format(
-                parameters['transmissivity']['zeta_max_cm']
-            ),
+            '  Ksmacz0: {}  # m/s'.format(T_parameters['Ksmacz0']),
+            '  alpha: {}  # dimensionless'.format(T_parameters['alpha']),
+            '  zeta_max_cm: {}'.format(T_parameters['zeta_max_cm']),
         ]
     else:
-        assert parameters['transmissivity']['type'] == 'spline'
+        assert T_parameters['type'] == 'spline'
         lines += ['  type: spline']
         lines += ['  zeta_knots_mm:']
         lines += [
             '    - {}'.format(value)
-            for value in parameters['transmissivity']['zeta_knots_mm']
+            for value in T_parameters['zeta_knots_mm']
         ]
         lines += ['  K_knots_km_d:  # Conductivity, km /d']
         lines += [
             '    - {}'.format(value)
-            for value in parameters['transmissivity']['K_knots_km_d']
+            for value in T_parameters['K_knots_km_d']
         ]
         lines += [
             '  minimum_transmissivity_m2_d: {}  '
             '# Minimum transmissivity, m2 /d'.format(
-                parameters['transmissivity']['minimum_transmissivity_m2_d']
+                T_parameters['minimum_transmissivity_m2_d']
             )
         ]
     outfile.write(os.linesep.join(lines))
@@ -147,14 +141,15 @@ def generate_rise_pst_file(
     connection, parameters, configuration, outfile, precision
 ):
     """Generate control file for calibration against rise curve"""
+    sy_parameters = parameters['specific_yield']
     # See Example 11.3 in pestman and Preface of addendum
-    parameterization = parameters['specific_yield']['type']
+    parameterization = sy_parameters['type']
     if parameterization not in ('peatclsm', 'spline'):
         raise ValueError(
             'Unrecognized parameterization "{}"'.format(parameterization)
         )
     if parameterization == 'spline':
-        npar = len(parameters['specific_yield']['sy_knots'])
+        npar = len(sy_parameters['sy_knots'])
         npargp = 1  # One parameter group
     else:
         npar = 4
@@ -172,7 +167,7 @@ def generate_rise_pst_file(
     FROM average_rising_depth
     ORDER BY zeta_mm"""
     )
-    avg_storage_mm = [row[0] for row in cursor.fetchall()]
+    avg_storage_mm = [row[0] for row in cursor]
     cursor.close()
     nobsgp = 1  # 1 observation group
     lines = [
@@ -223,13 +218,11 @@ def generate_rise_pst_file(
         ]
     lines += ['* observation groups', 'storageobs']
     lines += ['* observation data']
+    storage_format = 'e{{}}    {{:0.{}g}}    1.0   storageobs'.format(
+        precision
+    )
     lines += [
-        (
-            'e{{}}    {{:0.{}g}}    1.0   storageobs'.format(precision).format(
-                i + 1, W
-            )
-        )
-        for i, W in enumerate(avg_storage_mm)
+        storage_format.format(i + 1, W) for i, W in enumerate(avg_storage_mm)
     ]
     lines += [
         '* model command line',
@@ -250,8 +243,10 @@ def generate_curves_tpl_file(
     connection, parameters, configuration, outfile, precision
 ):
     """Generate template file for calibration against master curves"""
+    sy_parameters = parameters['specific_yield']
+    T_parameters = parameters['transmissivity']
     lines = ['ptf @', 'specific_yield:']
-    if parameters['specific_yield']['type'] == 'peatclsm':
+    if sy_parameters['type'] == 'peatclsm':
         lines += [
             '  type: peatclsm',
             '  sd: @sd                      @',
@@ -260,43 +255,37 @@ def generate_curves_tpl_file(
             '  psi_s: @psi_s                   @',
         ]
     else:
-        assert parameters['specific_yield']['type'] == 'spline'
+        assert sy_parameters['type'] == 'spline'
         lines += ['  type: spline', '  zeta_knots_mm:']
         lines += [
             '    - {}'.format(value)
-            for value in parameters['specific_yield']['zeta_knots_mm']
+            for value in sy_parameters['zeta_knots_mm']
         ]
         lines += ['  sy_knots:  # Specific yield, dimensionless']
         lines += [
             '    - @sy_knot_{}@'.format(str(i).ljust(16))
-            for i in range(
-                1, len(parameters['specific_yield']['sy_knots']) + 1
-            )
+            for i in range(1, len(sy_parameters['sy_knots']) + 1)
         ]
     lines += ['transmissivity:']
-    if parameters['transmissivity']['type'] == 'peatclsm':
+    if T_parameters['type'] == 'peatclsm':
         lines += [
             '  type: peatclsm',
             '  Ksmacz0: @Ksmacz0                 @  # m/s',
             '  alpha: @alpha                   @  # dimensionless',
-            '  zeta_max_cm: {}'.format(
-                parameters['transmissivity']['zeta_max_cm']
-            ),
+            '  zeta_max_cm: {}'.format(T_parameters['zeta_max_cm']),
         ]
     else:
-        assert parameters['transmissivity']['type'] == 'spline'
+        assert T_parameters['type'] == 'spline'
         lines += ['  type: spline']
         lines += ['  zeta_knots_mm:']
         lines += [
             '    - {}'.format(value)
-            for value in parameters['transmissivity']['zeta_knots_mm']
+            for value in T_parameters['zeta_knots_mm']
         ]
         lines += ['  K_knots_km_d:  # Conductivity, km /d']
         lines += [
             '    - @K_knot_{}@'.format(str(i).ljust(17))
-            for i in range(
-                1, len(parameters['transmissivity']['K_knots_km_d']) + 1
-            )
+            for i in range(1, len(T_parameters['K_knots_km_d']) + 1)
         ]
         lines += [
             '  minimum_transmissivity_m2_d: {}  '
@@ -339,15 +328,17 @@ def generate_curves_pst_file(
     connection, parameters, configuration, outfile, precision
 ):
     """Generate control file for calibration against master curves"""
+    sy_parameters = parameters['specific_yield']
+    T_parameters = parameters['transmissivity']
     # See Example 11.3 in pestman and Preface of addendum
-    parameterization = parameters['specific_yield']['type']
+    parameterization = sy_parameters['type']
     if parameterization not in ('peatclsm', 'spline'):
         raise ValueError(
             'Unrecognized parameterization "{}"'.format(parameterization)
         )
     if parameterization == 'spline':
-        n_Sy = len(parameters['specific_yield']['sy_knots'])
-        n_T = len(parameters['transmissivity']['K_knots_km_d'])
+        n_Sy = len(sy_parameters['sy_knots'])
+        n_T = len(T_parameters['K_knots_km_d'])
         npar = n_Sy + n_T + 1  # For minimum transmissivity
         npargp = 3  # Three parameter groups
     else:
@@ -361,7 +352,7 @@ def generate_curves_pst_file(
     FROM average_rising_depth
     ORDER BY zeta_mm"""
     )
-    avg_storage_mm = [row[0] for row in cursor.fetchall()]
+    avg_storage_mm = [row[0] for row in cursor]
     n_rise_zeta = len(avg_storage_mm)
     # Sort from highest to lowest water level, to match the way
     # recession curves are dumped and plotted.
@@ -372,7 +363,7 @@ def generate_curves_pst_file(
     FROM average_recession_time
     ORDER BY zeta_mm DESC"""
     )
-    elapsed_time_d = [row[0] for row in cursor.fetchall()]
+    elapsed_time_d = [row[0] for row in cursor]
     n_recession_zeta = len(elapsed_time_d)
     cursor.close()
     nobsgp = 2  # 2 observation groups
@@ -439,20 +430,15 @@ def generate_curves_pst_file(
         ]
     lines += ['* observation groups', 'storageobs', 'timeobs']
     lines += ['* observation data']
+    storage_format = 'e{{}}    {{:0.{}g}}    1.0   storageobs'.format(
+        precision
+    )
     lines += [
-        (
-            'e{{}}    {{:0.{}g}}    1.0   storageobs'.format(precision).format(
-                i + 1, W
-            )
-        )
-        for i, W in enumerate(avg_storage_mm)
+        storage_format.format(i + 1, W) for i, W in enumerate(avg_storage_mm)
     ]
+    time_format = 'e{{}}    {{:0.{}g}}    1.0   timeobs'.format(precision)
     lines += [
-        (
-            'e{{}}    {{:0.{}g}}    1.0   timeobs'.format(precision).format(
-                n_rise_zeta + i + 1, t
-            )
-        )
+        time_format.format(n_rise_zeta + i + 1, t)
         for i, t in enumerate(elapsed_time_d)
     ]
     lines += [
@@ -472,15 +458,13 @@ def generate_curves_pst_file(
 
 def check_parameters(parameters):
     """Check parameters for correctness"""
-    if parameters['specific_yield']['type'] not in ('peatclsm', 'spline'):
+    sy_parameters = parameters['specific_yield']
+    T_parameters = parameters['transmissivity']
+    if sy_parameters['type'] not in ('peatclsm', 'spline'):
         raise ValueError(
-            'Unexpected specific yield type: {}'.format(
-                parameters['specific_yield']['type']
-            )
+            'Unexpected specific yield type: {}'.format(sy_parameters['type'])
         )
-    if parameters['transmissivity']['type'] not in ('peatclsm', 'spline'):
+    if T_parameters['type'] not in ('peatclsm', 'spline'):
         raise ValueError(
-            'Unexpected specific yield type: {}'.format(
-                parameters['transmissivity']['type']
-            )
+            'Unexpected specific yield type: {}'.format(T_parameters['type'])
         )
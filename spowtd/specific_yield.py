@@ -4,7 +4,7 @@
 
 import numpy as np
 
-import scipy.stats
+import scipy.special
 
 import spowtd.spline as spline_mod
 
@@ -87,6 +87,13 @@ class PeatclsmSpecificYield(SpecificYield):
         'sy_knots',
     ]
 
+    # Lower and upper water levels of the intervals on which specific
+    # yield is calculated, and their midpoints, m; shared by all
+    # instances
+    _zl = np.linspace(-1, 1, 201)
+    _zu = np.linspace(-0.99, 1.01, 201)
+    _zm = 0.5 * (_zu + _zl)
+
     def __init__(self, sd, theta_s, b, psi_s):
         self.sd = sd
         self.theta_s = theta_s
@@ -96,17 +103,20 @@ class PeatclsmSpecificYield(SpecificYield):
         self.sy_knots = None
         SpecificYield.__init__(self, self._construct_spline())
 
+    def __call__(self, water_level_mm):
+        # The spline is linear between the precomputed knots, with
+        # constant extrapolation, which is exactly what np.interp does
+        return np.interp(water_level_mm, self.zeta_knots_mm, self.sy_knots)
+
     def _construct_spline(self):
         """Construct specific yield spline"""
         # Calculate the specific yield (Dettmann and Bechtold 2015,
         # Hydrological Processes)
-        zl_ = np.linspace(-1, 1, 201)
-        zu_ = np.linspace(-0.99, 1.01, 201)
-        Sy1_soil = np.empty((201,), dtype='float64')
-        Sy1_soil[:] = np.NaN
-        self.get_Sy_soil(Sy1_soil, zl_, zu_)
-        zeta_knots_m = 0.5 * (zu_ + zl_)
-        Sy1_surface = scipy.stats.norm.cdf(zeta_knots_m, loc=0, scale=self.sd)
+        # get_Sy_soil fills every element
+        Sy1_soil = np.empty(self._zl.shape, dtype='float64')
+        self.get_Sy_soil(Sy1_soil, self._zl, self._zu)
+        zeta_knots_m = self._zm
+        Sy1_surface = scipy.special.ndtr(zeta_knots_m / self.sd)
         self.sy_knots = Sy1_soil + Sy1_surface
         self.zeta_knots_mm = zeta_knots_m * 1000
         spline = spline_mod.Spline.from_points(
@@ -126,35 +136,40 @@ class PeatclsmSpecificYield(SpecificYield):
         psi_s = self.psi_s
         sd = self.sd
         zm_a = 0.5 * (zl_ + zu_)
-        Fs_a = scipy.stats.norm.cdf(zm_a, loc=0, scale=sd)
+        Fs_a = scipy.special.ndtr(zm_a / sd)
         dz = zu_ - zl_
-        for i in range(len(zl_)):
-            zl = zl_[i]
-            zu = zu_[i]
-            A = 0
-            for j in range(len(Sy_soil)):
-                zm = zm_a[j]
-                # Apply Campbell function to get soil moisture profile
-                # for lower (zl) water level
-                Azl = campbell_1d_az(Fs_a[j], zm, zl, theta_s, psi_s, b, sd)
-                # Apply campbell function to get soil moisture profile
-                # for upper (zu) water level
-                Azu = campbell_1d_az(Fs_a[j], zm, zu, theta_s, psi_s, b, sd)
-                A = A + dz[j] * (Azu - Azl)
-            Sy_soil[i] = 1 / (1 * dz[i]) * A
-
-
-def campbell_1d_az(Fs, z_, zlu, theta_s, psi_s, b, sd):
-    """Soil moisture profile from Campbell function and microtopography
-
-    See equations 4 and 5 in Dettmann & Bechtold 2015, Hydrological
-    Processes
+        # Rows are water levels, columns are microtopographic
+        # elevations.  Apply Campbell function to get soil moisture
+        # profile for lower (zl) and upper (zu) water levels; the
+        # weighted sum over elevations is a matrix-vector product.
+        theta_zl = campbell_1d_theta(
+            zm_a, zl_[:, np.newaxis], theta_s, psi_s, b
+        )
+        theta_zu = campbell_1d_theta(
+            zm_a, zu_[:, np.newaxis], theta_s, psi_s, b
+        )
+        Sy_soil[:] = np.dot(theta_zu - theta_zl, (1 - Fs_a) * dz) / dz
+
+
+def campbell_1d_theta(z_, zlu, theta_s, psi_s, b):
+    """Soil moisture from Campbell function
+
+    Soil moisture at elevation z_ when the water level is zlu.  Array
+    arguments are broadcast against each other.  The air entry
+    pressure psi_s must be negative.
 
     """
-    # PEATCLSM microtopographic distribution
-    if ((zlu - z_) * 100) >= (psi_s * 100):
-        theta = theta_s
-    else:
-        theta = theta_s * (((zlu - z_) * 100) / (psi_s * 100)) ** (-1 / b)
-    theta_Fs = (1 - Fs) * theta
-    return theta_Fs
+    if not psi_s < 0:
+        raise ValueError(
+            'Air entry pressure psi_s must be negative; got {}'.format(psi_s)
+        )
+    depth_cm = (zlu - z_) * 100
+    psi_s_cm = psi_s * 100
+    # Because psi_s_cm < 0, the ratio exceeds 1 where depth_cm <
+    # psi_s_cm; the ratio is unused elsewhere, so clip it there to
+    # avoid fractional powers of negative numbers
+    return np.where(
+        depth_cm >= psi_s_cm,
+        theta_s,
+        theta_s * np.maximum(depth_cm / psi_s_cm, 1) ** (-1 / b),
+    )
@@ -56,9 +56,7 @@ class Spline:
         extrapolation).
 
         """
-        x_clamped = np.minimum(
-            np.maximum(x, self._tck[0][0]), self._tck[0][-1]
-        )
+        x_clamped = np.clip(x, self._tck[0][0], self._tck[0][-1])
         return splev(x_clamped, self._tck, der=der)
 
     def integrate(self, a, b):
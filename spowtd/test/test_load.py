@@ -2,9 +2,200 @@
 
 """
 
+import datetime as datetime_mod
+import io
+import sqlite3
+
+import pytest
+
+import pytz
+
+import spowtd.load as load_mod
+
 
 def test_load_sample_data(loaded_connection):
     """Spowtd correctly loads sample data"""
     cursor = loaded_connection.cursor()
     # XXX Check loaded data
     cursor.close()
+
+
+def test_load_restores_pragmas(loaded_connection):
+    """Bulk load settings are restored after loading"""
+    assert_default_pragmas(loaded_connection)
+
+
+def test_failed_load_restores_pragmas(connection):
+    """Bulk load settings are restored and data rolled back on failure"""
+    with pytest.raises(ValueError, match='Expected 2 fields'):
+        load_mod.load_data(
+            connection=connection,
+            precipitation_data_file=io.StringIO(
+                'datetime,rainfall_intensity_mm_h\n'
+                '2021-01-01 00:00:00,0.0\n'
+                '2021-01-01 01:00:00\n'
+            ),
+            evapotranspiration_data_file=io.StringIO(''),
+            water_level_data_file=io.StringIO(''),
+            time_zone_name='Africa/Lagos',
+        )
+    assert not connection.in_transaction
+    assert (
+        connection.execute(
+            'SELECT count(*) FROM rainfall_intensity_staging'
+        ).fetchone()[0]
+        == 0
+    )
+    assert_default_pragmas(connection)
+
+
+def test_load_into_populated_database_keeps_pragmas(loaded_connection):
+    """Loading into a populated database fails without changing settings"""
+    with pytest.raises(ValueError, match='already populated'):
+        load_mod.load_data(
+            connection=loaded_connection,
+            precipitation_data_file=io.StringIO(''),
+            evapotranspiration_data_file=io.StringIO(''),
+            water_level_data_file=io.StringIO(''),
+            time_zone_name='Africa/Lagos',
+        )
+    assert_default_pragmas(loaded_connection)
+
+
+def assert_default_pragmas(connection):
+    """Assert that bulk load settings match those of a new connection"""
+    with sqlite3.connect(':memory:') as fresh_connection:
+        for name in load_mod.BULK_LOAD_PRAGMAS:
+            query = 'PRAGMA {}'.format(name)
+            assert (
+                connection.execute(query).fetchone()
+                == fresh_connection.execute(query).fetchone()
+            ), name
+
+
+def localized_timestamp(text, tz):
+    """Convert a text datetime to a UNIX timestamp one at a time"""
+    return tz.localize(
+        datetime_mod.datetime.strptime(text, load_mod.ISO_8601_FORMAT)
+    ).timestamp()
+
+
+def datetime_range(start, days):
+    """Text datetimes at 15-minute steps for a number of days"""
+    return [
+        str(start + datetime_mod.timedelta(minutes=15 * i))
+        for i in range(days * 24 * 4)
+    ]
+
+
+@pytest.mark.parametrize(
+    'time_zone_name, start',
+    [
+        # DST transitions on the hour
+        ('America/New_York', datetime_mod.datetime(2021, 1, 1)),
+        # 30-minute DST shift, with transitions at half past the hour
+        ('Australia/Lord_Howe', datetime_mod.datetime(2019, 1, 1)),
+        # Transitions at 00:01
+        ('America/St_Johns', datetime_mod.datetime(2009, 1, 1)),
+        # Change from +05:30 to +05:45
+        ('Asia/Kathmandu', datetime_mod.datetime(1986, 1, 1)),
+    ],
+)
+def test_epochs(time_zone_name, start):
+    """Epoch conversions agree with per-datetime localization"""
+    tz = pytz.timezone(time_zone_name)
+    datetimes = datetime_range(start, 365)
+    expected = [localized_timestamp(text, tz) for text in datetimes]
+    assert load_mod.get_epochs(datetimes, tz).tolist() == expected
+    assert [
+        row[0]
+        for row in load_mod.generate_timestamped_rows(
+            [[text] for text in datetimes], tz
+        )
+    ] == expected
+
+
+def test_epochs_without_zero_padding():
+    """Datetimes that are not zero-padded are parsed with strptime"""
+    tz = pytz.timezone('Africa/Lagos')
+    datetimes = [
+        '2021-01-01 00:30:00',
+        '2021-1-1 0:00:00',
+        '2021-01-01  01:00:00',
+        '2021-01-01 1:30:00',
+    ]
+    expected = [localized_timestamp(text, tz) for text in datetimes]
+    assert load_mod.get_epochs(datetimes, tz).tolist() == expected
+    assert [
+        row[0]
+        for row in load_mod.generate_timestamped_rows(
+            [[text] for text in datetimes], tz
+        )
+    ] == expected
+
+
+INVALID_DATETIMES = [
+    '2021-01-01 00:00:00.5',
+    '2021-01-01 24:00:00',
+    '2021-02-30 00:00:00',
+    '2021-01-01 00:00:00+05:00',
+    '2021-01-01 00:00:00Z',
+    '2021-01-01T00:00:00',
+    '2021-01-01 00:00',
+    '2021-01-01',
+    'NaT',
+    '',
+]
+
+
+@pytest.mark.parametrize('text', INVALID_DATETIMES)
+def test_get_epochs_rejects_invalid_datetimes(text):
+    """Datetimes not matching ISO_8601_FORMAT raise ValueError"""
+    with pytest.raises(ValueError):
+        load_mod.get_epochs(['2021-01-01 00:00:00', text], pytz.utc)
+
+
+@pytest.mark.parametrize('text', INVALID_DATETIMES)
+def test_generate_timestamped_rows_rejects_invalid_datetimes(text):
+    """Datetimes not matching ISO_8601_FORMAT raise ValueError"""
+    with pytest.raises(ValueError):
+        list(load_mod.generate_timestamped_rows([[text, '0.0']], pytz.utc))
+
+
+@pytest.mark.parametrize(
+    'row, line_number',
+    [
+        ('2021-01-01 01:00:00,1.0,2.0', 3),
+        ('2021-01-01 01:00:00', 3),
+    ],
+)
+def test_load_staging_rejects_ragged_rows(connection, row, line_number):
+    """Rows without exactly two fields raise ValueError"""
+    data_file = io.StringIO(
+        'datetime,zeta_mm\n2021-01-01 00:00:00,0.0\n{}\n'.format(row)
+    )
+    connection.executescript(load_mod.SCHEMA_SQL)
+    with pytest.raises(ValueError, match='line {}'.format(line_number)):
+        load_mod.load_staging(
+            connection.cursor(),
+            data_file,
+            'water_level_staging',
+            'zeta_mm',
+            pytz.utc,
+        )
+
+
+def test_load_staging_skips_blank_lines(connection):
+    """Blank lines in data files are skipped"""
+    data_file = io.StringIO(
+        'datetime,zeta_mm\n2021-01-01 00:00:00,0.0\n\n'
+        '2021-01-01 01:00:00,1.0\n\n'
+    )
+    connection.executescript(load_mod.SCHEMA_SQL)
+    cursor = connection.cursor()
+    load_mod.load_staging(
+        cursor, data_file, 'water_level_staging', 'zeta_mm', pytz.utc
+    )
+    assert cursor.execute(
+        'SELECT epoch, zeta_mm FROM water_level_staging ORDER BY epoch'
+    ).fetchall() == [(1609459200, 0.0), (1609462800, 1.0)]
@@ -6,6 +6,8 @@ import numpy as np
 
 import pytest
 
+import scipy.stats
+
 import yaml
 
 import spowtd.plot_specific_yield as plot_mod
@@ -56,3 +58,55 @@ def test_specific_yield(sy_type, expected_sy):
         zeta_m_ref, expected_sy = zip(*sy_table)
         assert np.allclose(zeta_m, zeta_m_ref)
         assert np.allclose(specific_yield(zeta_m * 1000), expected_sy)
+
+
+def test_peatclsm_specific_yield_rejects_positive_psi_s():
+    """PEATCLSM specific yield requires negative air entry pressure"""
+    with pytest.raises(ValueError):
+        specific_yield_mod.PeatclsmSpecificYield(
+            sd=0.1, theta_s=0.8, b=5, psi_s=0.05
+        )
+
+
+def test_peatclsm_soil_specific_yield():
+    """PEATCLSM soil specific yield matches Dettmann & Bechtold 2015 eqn 1
+
+    Compares against a direct double-loop evaluation of the integral
+    over microtopography, as in PEATCLSM.
+
+    """
+    with open(conftest.get_parameter_file_path('peatclsm'), 'rt') as sy_file:
+        sy_parameters = yaml.safe_load(sy_file)['specific_yield']
+    del sy_parameters['type']
+    specific_yield = specific_yield_mod.PeatclsmSpecificYield(**sy_parameters)
+    sd = sy_parameters['sd']
+    theta_s = sy_parameters['theta_s']
+    b = sy_parameters['b']
+    psi_s = sy_parameters['psi_s']
+
+    def campbell_1d_az(Fs, z_, zlu):
+        """Soil moisture from Campbell function and microtopography"""
+        if ((zlu - z_) * 100) >= (psi_s * 100):
+            theta = theta_s
+        else:
+            theta = theta_s * (((zlu - z_) * 100) / (psi_s * 100)) ** (-1 / b)
+        return (1 - Fs) * theta
+
+    zl_ = np.linspace(-1, 1, 201)
+    zu_ = np.linspace(-0.99, 1.01, 201)
+    zm_a = 0.5 * (zl_ + zu_)
+    Fs_a = scipy.stats.norm.cdf(zm_a, loc=0, scale=sd)
+    dz = zu_ - zl_
+    expected = np.empty((201,), dtype='float64')
+    for i, (zl, zu) in enumerate(zip(zl_, zu_)):
+        A = 0
+        for j, zm in enumerate(zm_a):
+            A += dz[j] * (
+                campbell_1d_az(Fs_a[j], zm, zu)
+                - campbell_1d_az(Fs_a[j], zm, zl)
+            )
+        expected[i] = A / dz[i]
+
+    Sy_soil = np.empty((201,), dtype='float64')
+    specific_yield.get_Sy_soil(Sy_soil, zl_, zu_)
+    assert np.allclose(Sy_soil, expected, rtol=1e-12, atol=1e-14)
@@ -325,21 +325,33 @@ def add_load_args(parser):
         '-p',
         '--precipitation',
         help='Precipitation data file',
-        type=argparse.FileType('rt', encoding='utf-8-sig'),
+        type=argparse.FileType(
+            'rt',
+            bufsize=load_mod.DATA_FILE_BUFFER_SIZE,
+            encoding='utf-8-sig',
+        ),
         required=True,
     )
     parser.add_argument(
         '-e',
         '--evapotranspiration',
         help='Evapotranspiration data file',
-        type=argparse.FileType('rt', encoding='utf-8-sig'),
+        type=argparse.FileType(
+            'rt',
+            bufsize=load_mod.DATA_FILE_BUFFER_SIZE,
+            encoding='utf-8-sig',
+        ),
         required=True,
     )
     parser.add_argument(
         '-z',
         '--water-level',
         help='Water level data file',
-        type=argparse.FileType('rt', encoding='utf-8-sig'),
+        type=argparse.FileType(
+            'rt',
+            bufsize=load_mod.DATA_FILE_BUFFER_SIZE,
+            encoding='utf-8-sig',
+        ),
         required=True,
     )
     parser.add_argument(
@@ -24,12 +24,12 @@ def populate_zeta_grid(connection, grid_interval_mm):
         """
     INSERT INTO discrete_zeta (zeta_number)
     VALUES (?)""",
-        [
+        (
             (zn,)
             for zn in range(
                 int(math.floor(zeta_bounds[0] / grid_interval_mm)),
                 int(math.ceil(zeta_bounds[1] / grid_interval_mm)),
             )
-        ],
+        ),
     )
     cursor.close()